@@ -1,10 +1,29 @@
 import os
-import ssl
-from flask import Flask, render_template, redirect, url_for, flash, request
+from flask import (Flask, render_template, redirect, url_for, flash, request, jsonify,
+                   Response, stream_with_context, make_response, session, g, abort,
+                   has_request_context, request_started, request_finished,
+                   before_render_template, template_rendered)
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import text, select, insert, func, inspect, event
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.orm import joinedload
+from markupsafe import Markup
 from dotenv import load_dotenv
 from datetime import datetime
-from urllib.parse import urlparse
+from urllib.parse import urlparse, parse_qs
+from collections import namedtuple, OrderedDict, Counter
+import base64
+import csv
+import hashlib
+import io
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+import click
 
 # Cargar variables de entorno
 load_dotenv()
@@ -16,31 +35,213 @@ app.secret_key = os.getenv('SECRET_KEY', 'una-clave-secreta-muy-segura')
 # CONFIGURACIÓN DE LA BASE DE DATOS (PostgreSQL)
 # =============================================
 
-# Asegurar que la URL comience con postgresql://
-db_uri = os.getenv('DATABASE_URL')
-if db_uri and db_uri.startswith("postgres://"):
-    db_uri = db_uri.replace("postgres://", "postgresql://", 1)
+def normalize_database_url(url):
+    """Asegura que la URL comience con postgresql://"""
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
 
-# Configuración de SSL para Render.com
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
+db_uri = normalize_database_url(os.getenv('DATABASE_URL'))
+
+def build_connect_args(url, **extra):
+    """
+    Configuración de SSL para Render.com: sslmode=require cifra la conexión sin
+    verificar el certificado. Un sslmode en la URL (p. ej. ?sslmode=disable para
+    un PostgreSQL local) o DATABASE_SSLMODE tienen prioridad.
+    """
+    connect_args = dict(extra)
+    if 'sslmode' not in parse_qs(urlparse(url or '').query):
+        connect_args['sslmode'] = os.getenv('DATABASE_SSLMODE', 'require')
+    return connect_args
+
+connect_args = build_connect_args(db_uri)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = db_uri
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'connect_args': {
-        'sslmode': 'require',
-        'ssl': ssl_context
-    },
+    'connect_args': connect_args,
     'pool_pre_ping': True,  # Verifica conexiones antes de usarlas
     'pool_recycle': 300,    # Recicla conexiones cada 300 segundos
     'pool_size': 5,         # Número máximo de conexiones en el pool
     'max_overflow': 10,     # Conexiones adicionales si el pool está lleno
     'pool_timeout': 30      # Tiempo de espera para obtener una conexión
 }
+# SQLite (desarrollo local y pruebas) no usa SSL ni las opciones del pool
+if db_uri and db_uri.startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db = SQLAlchemy(app)
+# Réplicas de solo lectura (opcional): URLs separadas por comas.
+# Cada una es un bind de Flask-SQLAlchemy con su propio engine y pool.
+replica_uris = [normalize_database_url(url.strip())
+                for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+# Una réplica que no responde no debe colgar al worker: timeout de conexión corto
+app.config['DATABASE_REPLICA_CONNECT_TIMEOUT'] = int(os.getenv('DATABASE_REPLICA_CONNECT_TIMEOUT', 3))
+
+def replica_bind(url):
+    if url.startswith('sqlite'):
+        return {'url': url}
+    return {'url': url, 'connect_args': build_connect_args(
+        url, connect_timeout=app.config['DATABASE_REPLICA_CONNECT_TIMEOUT'])}
+
+app.config['SQLALCHEMY_BINDS'] = {f'replica_{i}': replica_bind(url)
+                                  for i, url in enumerate(replica_uris)}
+# Tras una escritura, las lecturas de ese cliente van al primario durante este tiempo
+app.config['DATABASE_STICKY_SECONDS'] = float(os.getenv('DATABASE_STICKY_SECONDS', 5))
+# Intervalo entre health checks de cada réplica (en un hilo de fondo por worker)
+app.config['DATABASE_REPLICA_CHECK_SECONDS'] = float(os.getenv('DATABASE_REPLICA_CHECK_SECONDS', 10))
+
+# Número de posts por página en el listado
+app.config['POSTS_PER_PAGE'] = int(os.getenv('POSTS_PER_PAGE', 20))
+
+# Tamaño de lote para exportar/importar posts en bloque
+app.config['BULK_BATCH_SIZE'] = int(os.getenv('BULK_BATCH_SIZE', 1000))
+
+# Caché de tarjetas de posts ya renderizadas (por worker)
+app.config['FRAGMENT_CACHE_ENABLED'] = os.getenv('FRAGMENT_CACHE_ENABLED', '1') == '1'
+app.config['FRAGMENT_CACHE_MAX_BYTES'] = int(os.getenv('FRAGMENT_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+# Instrumentación por petición (SQL, pool, plantillas) y endpoint /metrics
+app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', '0') == '1'
+app.config['METRICS_SERVER_TIMING'] = os.getenv('METRICS_SERVER_TIMING', '0') == '1'
+app.config['METRICS_SLOW_REQUEST_MS'] = float(os.getenv('METRICS_SLOW_REQUEST_MS', 500))
+# Directorio compartido donde cada worker vuelca sus contadores para que /metrics
+# los sume. Por defecto uno por proceso padre (el maestro de gunicorn).
+app.config['METRICS_DIR'] = os.getenv('METRICS_DIR') or os.path.join(
+    tempfile.gettempdir(), f'blog-metrics-{os.getppid()}')
+app.config['METRICS_FLUSH_SECONDS'] = float(os.getenv('METRICS_FLUSH_SECONDS', 1))
+
+# =============================================
+# ENRUTAMIENTO A RÉPLICAS DE LECTURA
+# =============================================
+
+# Rutas GET que escriben en la base de datos
+WRITE_ENDPOINTS = {'delete_post', 'delete_category'}
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+class ReplicaRouter:
+    """
+    Reparte las lecturas entre las réplicas sanas (round-robin). Un hilo por
+    worker comprueba cada réplica con SELECT 1 una vez por intervalo; las
+    peticiones solo leen el último estado, así que una réplica lenta nunca
+    bloquea una petición. Hasta su primer check correcto, o si una consulta
+    pierde la conexión, la réplica queda fuera y se lee del primario.
+    """
+    def __init__(self, bind_keys, check_interval):
+        self.bind_keys = list(bind_keys)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next = 0
+        self._healthy = {}
+        self._checker_pid = None
+
+    def start(self):
+        """Lanza el hilo de health checks en este proceso (tras el fork de gunicorn)."""
+        with self._lock:
+            if self._checker_pid == os.getpid():
+                return
+            self._checker_pid = os.getpid()
+        threading.Thread(target=self._run, name='replica-health', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self.check_all()
+            time.sleep(self.check_interval)
+
+    def check_all(self):
+        with app.app_context():
+            for key in self.bind_keys:
+                self.check(key)
+
+    def check(self, key):
+        try:
+            with db.engines[key].connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            self.mark_down(key, e)
+            return False
+        self._healthy[key] = True
+        return True
+
+    def choose(self):
+        """Devuelve el engine de una réplica sana, o None para usar el primario."""
+        self.start()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.bind_keys)
+        for i in range(len(self.bind_keys)):
+            key = self.bind_keys[(start + i) % len(self.bind_keys)]
+            if self._healthy.get(key):
+                return db.engines[key]
+        return None
+
+    def mark_down(self, key, error=None):
+        if self._healthy.get(key, True):
+            app.logger.warning("Réplica %s fuera de servicio, se usa el primario: %s", key, error)
+        self._healthy[key] = False
+
+    def watch(self):
+        """Marca como caída una réplica cuando una consulta pierde la conexión."""
+        for key in self.bind_keys:
+            def on_error(context, key=key):
+                if context.is_disconnect:
+                    self.mark_down(key, context.original_exception)
+            event.listen(db.engines[key], 'handle_error', on_error)
+
+    def stats(self):
+        return {key: {'healthy': bool(self._healthy.get(key))} for key in self.bind_keys}
+
+replica_router = (ReplicaRouter(app.config['SQLALCHEMY_BINDS'],
+                                app.config['DATABASE_REPLICA_CHECK_SECONDS'])
+                  if replica_uris else None)
+
+def is_write_request():
+    return request.method not in READ_METHODS or request.endpoint in WRITE_ENDPOINTS
+
+def is_write_clause(clause):
+    """True para INSERT/UPDATE/DELETE (incluido query.update()) y SQL textual que no sea SELECT."""
+    if clause is None:
+        return False
+    if getattr(clause, 'is_dml', False):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith('SELECT')
+    return False
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """
+    Sesión que envía las lecturas a la réplica elegida para la petición.
+    Cualquier escritura (flush o DML explícito) va al primario, y desde ese
+    momento el resto de la petición también lee del primario.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get('read_replica') is not None:
+            if self._flushing or self.new or self.dirty or self.deleted or is_write_clause(clause):
+                g.read_replica = None
+            else:
+                return g.read_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+
+if replica_router:
+    with app.app_context():
+        replica_router.watch()
+
+@app.before_request
+def choose_read_replica():
+    g.read_replica = None
+    if replica_router is None or is_write_request():
+        return
+    # Read-your-writes: tras escribir, este cliente lee del primario un tiempo
+    if session.get('primary_until', 0) > time.time():
+        return
+    g.read_replica = replica_router.choose()
+
+@app.after_request
+def stick_to_primary(response):
+    if replica_router is not None and is_write_request():
+        session['primary_until'] = time.time() + app.config['DATABASE_STICKY_SECONDS']
+    return response
 
 # =============================================
 # MODELOS DE LA BASE DE DATOS
@@ -50,6 +251,8 @@ class Category(db.Model):
     __tablename__ = 'categories'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
+    # Contador denormalizado, mantenido en la misma transacción que los posts
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     posts = db.relationship('Post', backref='category', lazy=True)
 
 class Post(db.Model):
@@ -59,6 +262,874 @@ class Post(db.Model):
     content = db.Column(db.Text, nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    # Índice compuesto para la paginación por cursor (created_at, id)
+    __table_args__ = (
+        db.Index('ix_posts_created_at_id', created_at.desc(), id.desc()),
+        # Listado por categoría con el mismo cursor
+        db.Index('ix_posts_category_created_at', category_id, created_at.desc(), id.desc()),
+    )
+
+class CacheVersion(db.Model):
+    """Contador de generación compartido por todos los workers de gunicorn."""
+    __tablename__ = 'cache_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# =============================================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# =============================================
+
+def encode_cursor(post):
+    """Codifica la posición (created_at, id) de un post en un cursor opaco."""
+    raw = f"{post.created_at.isoformat()}|{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Devuelve la tupla (created_at, id) del cursor, o None si no es válido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, post_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, TypeError):
+        return None
+
+def paginate_posts(query, after=None, before=None, per_page=None):
+    """
+    Pagina una consulta de posts por (created_at, id) sin usar OFFSET.
+    Devuelve (posts, cursor_siguiente, cursor_anterior).
+    """
+    per_page = per_page or app.config['POSTS_PER_PAGE']
+    key = db.tuple_(Post.created_at, Post.id)
+    query = query.options(joinedload(Post.category))
+
+    after = decode_cursor(after) if after else None
+    before = decode_cursor(before) if before else None
+
+    if before:
+        # Página anterior: se recorre en orden ascendente y se invierte
+        rows = (query.filter(key > before)
+                     .order_by(Post.created_at.asc(), Post.id.asc())
+                     .limit(per_page + 1).all())
+        has_more = len(rows) > per_page
+        posts = list(reversed(rows[:per_page]))
+        has_next, has_prev = True, has_more
+    else:
+        if after:
+            query = query.filter(key < after)
+        rows = (query.order_by(Post.created_at.desc(), Post.id.desc())
+                     .limit(per_page + 1).all())
+        has_more = len(rows) > per_page
+        posts = rows[:per_page]
+        has_next, has_prev = has_more, bool(after)
+
+    next_cursor = encode_cursor(posts[-1]) if posts and has_next else None
+    prev_cursor = encode_cursor(posts[0]) if posts and has_prev else None
+    return posts, next_cursor, prev_cursor
+
+# =============================================
+# CACHÉ DE CATEGORÍAS (COMPARTIDA ENTRE WORKERS)
+# =============================================
+
+CategoryItem = namedtuple('CategoryItem', ['id', 'name'])
+
+def get_cache_version(name):
+    """Lee la versión actual de una caché desde la base de datos."""
+    version = db.session.query(CacheVersion.version).filter_by(name=name).scalar()
+    return version or 0
+
+def bump_cache_version(name):
+    """
+    Incrementa la versión de una caché dentro de la transacción actual,
+    de modo que todos los workers recarguen sus datos en la siguiente lectura.
+    """
+    updated = (CacheVersion.query.filter_by(name=name)
+               .update({CacheVersion.version: CacheVersion.version + 1,
+                        CacheVersion.updated_at: datetime.utcnow()},
+                       synchronize_session=False))
+    if not updated:
+        db.session.add(CacheVersion(name=name, version=1))
+
+class CategoryCache:
+    """
+    Lista de categorías en memoria de cada worker. Solo se consulta la
+    versión (una lectura por clave primaria); la lista completa se recarga
+    cuando otro worker la ha incrementado.
+    """
+    cache_name = 'categories'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._items = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self):
+        version = get_cache_version(self.cache_name)
+        with self._lock:
+            if version == self._version:
+                self.hits += 1
+                return self._items
+        items = [CategoryItem(c.id, c.name)
+                 for c in Category.query.order_by(Category.name).all()]
+        with self._lock:
+            self.misses += 1
+            self._version = version
+            self._items = items
+        return items
+
+    def invalidate(self):
+        bump_cache_version(self.cache_name)
+
+    def stats(self):
+        with self._lock:
+            return {'version': self._version, 'size': len(self._items),
+                    'hits': self.hits, 'misses': self.misses}
+
+category_cache = CategoryCache()
+
+# =============================================
+# CONTADORES DE POSTS POR CATEGORÍA
+# =============================================
+
+def adjust_post_count(category_id, delta):
+    """
+    Suma delta al contador de posts de la categoría dentro de la transacción
+    actual (UPDATE atómico, sin leer el valor previo).
+    """
+    if category_id is None:
+        return
+    (Category.query.filter_by(id=category_id)
+     .update({Category.post_count: Category.post_count + delta},
+             synchronize_session=False))
+
+def adjust_post_counts(deltas):
+    """
+    Aplica varios ajustes {category_id: delta} en orden de id. Bloquear las
+    filas siempre en el mismo orden evita interbloqueos en PostgreSQL entre
+    peticiones que mueven posts en sentidos opuestos (A→B y B→A).
+    """
+    for category_id in sorted(key for key in deltas if key is not None):
+        if deltas[category_id]:
+            adjust_post_count(category_id, deltas[category_id])
+
+def rebuild_post_counts():
+    """Recalcula todos los contadores a partir de la tabla posts."""
+    counted = (select(func.count(Post.id))
+               .where(Post.category_id == Category.id)
+               .scalar_subquery())
+    updated = Category.query.update({Category.post_count: counted},
+                                    synchronize_session=False)
+    # Los contadores cambian sin que cambien los posts: invalida el ETag de /categories
+    category_cache.invalidate()
+    return updated
+
+# =============================================
+# CACHÉ DE FRAGMENTOS (TARJETAS DE POSTS)
+# =============================================
+
+class FragmentCache:
+    """
+    Caché LRU de las tarjetas HTML de los posts, limitada en bytes.
+    La clave incluye updated_at y el nombre de la categoría, así que un
+    worker nunca sirve una tarjeta desactualizada aunque la invalidación
+    explícita solo libere memoria en el worker que hizo el cambio.
+    """
+    template_name = 'post_card.html'
+    # Memoria aproximada de cada entrada además del texto: clave (tupla, fecha,
+    # nombre de categoría), tupla de la entrada y hueco en el OrderedDict
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(post):
+        category_name = post.category.name if post.category else None
+        return (post.id, post.updated_at, category_name)
+
+    def render(self, post):
+        if not app.config['FRAGMENT_CACHE_ENABLED']:
+            return self._render(post)
+        key = self.key(post)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        fragment = self._render(post)
+        with self._lock:
+            self.misses += 1
+            self._store(key, post.category_id, fragment)
+        return fragment
+
+    def _render(self, post):
+        template = app.jinja_env.get_template(self.template_name)
+        return Markup(template.render(post=post))
+
+    @classmethod
+    def entry_size(cls, fragment):
+        """Bytes que ocupa la entrada en memoria (no caracteres: los acentos cuentan más)."""
+        return sys.getsizeof(fragment) + cls.ENTRY_OVERHEAD
+
+    def _store(self, key, category_id, fragment):
+        size = self.entry_size(fragment)
+        if key in self._entries or size > self.max_bytes:
+            return
+        self._entries[key] = (category_id, fragment, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def _discard(self, predicate):
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if predicate(k, entry)]:
+                self.size -= self._entries.pop(key)[2]
+
+    def invalidate_post(self, post_id):
+        self._discard(lambda key, entry: key[0] == post_id)
+
+    def invalidate_category(self, category_id):
+        self._discard(lambda key, entry: entry[0] == category_id)
+
+    def clear(self):
+        self._discard(lambda key, entry: True)
+
+    def stats(self):
+        with self._lock:
+            return {'enabled': app.config['FRAGMENT_CACHE_ENABLED'],
+                    'entries': len(self._entries), 'bytes': self.size,
+                    'max_bytes': self.max_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+post_card_cache = FragmentCache(app.config['FRAGMENT_CACHE_MAX_BYTES'])
+
+@app.template_global()
+def post_card(post):
+    """Devuelve la tarjeta HTML del post, desde la caché si está disponible."""
+    return post_card_cache.render(post)
+
+# =============================================
+# GET CONDICIONAL (ETag / Last-Modified)
+# =============================================
+
+# Generación que se incrementa con cada post eliminado
+POST_DELETIONS = 'post_deletions'
+
+def versions_validator(*names):
+    """Devuelve las versiones y la fecha de cambio más reciente de las cachés dadas."""
+    rows = (db.session.query(CacheVersion.name, CacheVersion.version, CacheVersion.updated_at)
+            .filter(CacheVersion.name.in_(names)).all())
+    versions = {name: (version, updated_at) for name, version, updated_at in rows}
+    parts = [versions.get(name, (0, None))[0] for name in names]
+    dates = [updated_at for _, updated_at in versions.values() if updated_at]
+    return parts, max(dates, default=None)
+
+def posts_state():
+    """
+    Estado de posts y categorías sin leer las tablas: máximo updated_at y
+    máximo id (ambos por índice), más las generaciones de borrados de posts
+    y de cambios de categorías. Devuelve (partes, last_modified).
+    """
+    # Dos subconsultas: un max() por consulta se resuelve con una búsqueda en
+    # el índice; los dos en el mismo SELECT recorren el índice entero en SQLite
+    last_updated, last_id = db.session.query(
+        select(func.max(Post.updated_at)).scalar_subquery(),
+        select(func.max(Post.id)).scalar_subquery()).one()
+    parts, versions_date = versions_validator(POST_DELETIONS, category_cache.cache_name)
+    parts += [last_id, last_updated.isoformat() if last_updated else None]
+    last_modified = max(filter(None, [last_updated, versions_date]), default=None)
+    return parts, last_modified
+
+def posts_validator():
+    """Calcula (etag, last_modified) del listado de posts."""
+    parts, last_modified = posts_state()
+    return make_etag(['posts'] + parts), last_modified
+
+def categories_validator():
+    """
+    Calcula (etag, last_modified) del listado de categorías. Muestra los
+    contadores post_count, que cambian con cada alta, baja o cambio de
+    categoría de un post, así que depende del mismo estado que los posts.
+    """
+    parts, last_modified = posts_state()
+    return make_etag(['categories'] + parts), last_modified
+
+def make_etag(parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def not_modified(etag, last_modified):
+    """
+    Devuelve una respuesta 304 si el cliente ya tiene la versión actual
+    (If-None-Match / If-Modified-Since), o None si hay que renderizar.
+    """
+    # Con mensajes flash pendientes la página cambia aunque los datos no
+    if '_flashes' in session:
+        return None
+    response = with_validators(Response(), etag, last_modified)
+    response.make_conditional(request)
+    return response if response.status_code == 304 else None
+
+def with_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Obliga a revalidar siempre (navegador y proxy) antes de reutilizarla
+    response.cache_control.no_cache = True
+    return response
+
+# =============================================
+# BÚSQUEDA DE TEXTO COMPLETO
+# =============================================
+
+# PostgreSQL: columna tsvector generada + índice GIN.
+# La columna es GENERATED, así que se actualiza en la misma transacción
+# que cualquier INSERT/UPDATE de posts.
+POSTGRES_SEARCH_DDL = [
+    """ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+       GENERATED ALWAYS AS (
+           setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+           setweight(to_tsvector('spanish', coalesce(content, '')), 'B')
+       ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING GIN (search_vector)",
+]
+
+# SQLite: tabla FTS5 de contenido externo sincronizada con triggers
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE posts_fts USING fts5(
+           title, content, content='posts', content_rowid='id',
+           tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+           INSERT INTO posts_fts(rowid, title, content)
+           VALUES (new.id, new.title, new.content);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+           INSERT INTO posts_fts(posts_fts, rowid, title, content)
+           VALUES ('delete', old.id, old.title, old.content);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+           INSERT INTO posts_fts(posts_fts, rowid, title, content)
+           VALUES ('delete', old.id, old.title, old.content);
+           INSERT INTO posts_fts(rowid, title, content)
+           VALUES (new.id, new.title, new.content);
+       END""",
+    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+]
+
+def init_search_index():
+    """Crea (si no existe) el índice de búsqueda según el motor de base de datos."""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        statements = POSTGRES_SEARCH_DDL
+    elif dialect == 'sqlite':
+        exists = db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+        )).scalar()
+        statements = [] if exists else SQLITE_SEARCH_DDL
+    else:
+        return
+    for statement in statements:
+        db.session.execute(text(statement))
+
+def fts5_query(q):
+    """Convierte el texto del usuario en una consulta FTS5 segura (AND de términos)."""
+    return ' '.join('"%s"' % term.replace('"', '""') for term in q.split())
+
+def search_post_ids(q, limit, offset):
+    """Devuelve los ids de los posts que coinciden con q, ordenados por relevancia."""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        sql = text("""
+            SELECT id FROM posts, websearch_to_tsquery('spanish', :q) AS query
+            WHERE search_vector @@ query
+            ORDER BY ts_rank(search_vector, query) DESC, id DESC
+            LIMIT :limit OFFSET :offset""")
+    elif dialect == 'sqlite':
+        q = fts5_query(q)
+        sql = text("""
+            SELECT rowid FROM posts_fts WHERE posts_fts MATCH :q
+            ORDER BY rank, rowid DESC
+            LIMIT :limit OFFSET :offset""")
+    else:
+        raise RuntimeError(f"Búsqueda no soportada para el motor '{dialect}'")
+    rows = db.session.execute(sql, {'q': q, 'limit': limit, 'offset': offset})
+    return [row[0] for row in rows]
+
+def search_posts(q, page=1, per_page=None):
+    """
+    Busca posts por título y contenido usando el índice de texto completo.
+    Devuelve (posts, hay_pagina_siguiente).
+    """
+    per_page = per_page or app.config['POSTS_PER_PAGE']
+    ids = search_post_ids(q, per_page + 1, (page - 1) * per_page)
+    has_next = len(ids) > per_page
+    ids = ids[:per_page]
+    if not ids:
+        return [], False
+    posts = (Post.query.options(joinedload(Post.category))
+             .filter(Post.id.in_(ids)).all())
+    position = {post_id: i for i, post_id in enumerate(ids)}
+    posts.sort(key=lambda post: position[post.id])
+    return posts, has_next
+
+# =============================================
+# EXPORTACIÓN E IMPORTACIÓN EN BLOQUE
+# =============================================
+
+EXPORT_FIELDS = ['id', 'title', 'content', 'category', 'created_at']
+BULK_FORMATS = ('ndjson', 'csv')
+
+def iter_export_rows():
+    """
+    Recorre todos los posts con el nombre de su categoría usando un cursor
+    del lado del servidor (yield_per), sin cargar la tabla en memoria.
+    """
+    stmt = (select(Post.id, Post.title, Post.content,
+                   Category.name.label('category'), Post.created_at)
+            .outerjoin(Category, Post.category_id == Category.id)
+            .order_by(Post.id)
+            .execution_options(yield_per=app.config['BULK_BATCH_SIZE']))
+    for row in db.session.execute(stmt):
+        record = row._asdict()
+        record['created_at'] = row.created_at.isoformat() if row.created_at else None
+        yield record
+
+def generate_ndjson(rows):
+    for record in rows:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+def generate_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for record in rows:
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_import_records(stream, fmt):
+    """Lee registros de posts desde un flujo de texto NDJSON o CSV."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Línea {line_number}: JSON inválido ({e})")
+
+def resolve_category_ids(names):
+    """
+    Devuelve {nombre: id} para los nombres dados con una sola consulta,
+    creando las categorías que todavía no existan.
+    """
+    if not names:
+        return {}
+    rows = db.session.execute(
+        select(Category.name, Category.id).where(Category.name.in_(names))
+    ).all()
+    ids = {name: category_id for name, category_id in rows}
+    missing = [name for name in names if name not in ids]
+    if missing:
+        result = db.session.execute(
+            insert(Category).returning(Category.name, Category.id),
+            [{'name': name} for name in missing],
+        )
+        ids.update({name: category_id for name, category_id in result})
+        category_cache.invalidate()
+    return ids
+
+class ImportPostsError(Exception):
+    """
+    Error durante una importación en bloque. Los lotes anteriores ya están
+    confirmados: imported indica cuántos posts quedaron guardados (se puede
+    reanudar desde el registro imported + 1) y record el número, desde 1,
+    del registro que falló (o el primero del lote si falló el INSERT).
+    """
+    def __init__(self, message, imported, record):
+        super().__init__(message)
+        self.imported = imported
+        self.record = record
+
+def record_text(record, field):
+    """Devuelve el campo como texto sin espacios ('' si falta); rechaza otros tipos."""
+    value = record.get(field)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ValueError(f"El campo '{field}' debe ser texto")
+    return value.strip()
+
+def parse_post_record(record):
+    """Valida y normaliza un registro de importación (antes de tocar la base)."""
+    if not isinstance(record, dict):
+        raise ValueError('El registro debe ser un objeto')
+    title = record_text(record, 'title')
+    content = record_text(record, 'content')
+    if not title or not content:
+        raise ValueError('Título y contenido son requeridos')
+    created_at = record_text(record, 'created_at')
+    return {
+        'title': title,
+        'content': content,
+        'category': record_text(record, 'category'),
+        'created_at': datetime.fromisoformat(created_at) if created_at else None,
+    }
+
+def insert_post_batch(batch):
+    """Inserta un lote de registros ya validados con un INSERT de múltiples filas."""
+    names = {record['category'] for record in batch}
+    names.discard('')
+    category_ids = resolve_category_ids(names)
+    now = datetime.utcnow()
+    rows = [{
+        'title': record['title'],
+        'content': record['content'],
+        'category_id': category_ids.get(record['category']),
+        'created_at': record['created_at'] or now,
+    } for record in batch]
+    db.session.execute(insert(Post), rows)
+    adjust_post_counts(Counter(row['category_id'] for row in rows))
+    db.session.commit()
+    return len(rows)
+
+_END_OF_RECORDS = object()
+
+def import_posts(records, batch_size=None):
+    """
+    Importa posts en lotes; cada lote se confirma en su propia transacción.
+    Devuelve el número de posts insertados. Si algo falla lanza
+    ImportPostsError con los posts ya confirmados, para poder reanudar
+    desde ese registro sin duplicar.
+    """
+    batch_size = batch_size or app.config['BULK_BATCH_SIZE']
+    records = iter(records)
+    imported = 0
+    batch = []
+    try:
+        while True:
+            number = imported + len(batch) + 1
+            try:
+                record = next(records, _END_OF_RECORDS)
+                if record is _END_OF_RECORDS:
+                    break
+                batch.append(parse_post_record(record))
+            except ValueError as e:
+                raise ImportPostsError(f"Registro {number}: {e}", imported, number)
+            if len(batch) >= batch_size:
+                imported += insert_post_batch(batch)
+                batch = []
+        if batch:
+            imported += insert_post_batch(batch)
+    except ImportPostsError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        # Error de la base: el lote en curso completo no se guardó
+        db.session.rollback()
+        raise ImportPostsError(str(e), imported, imported + 1)
+    return imported
+
+# =============================================
+# INSTRUMENTACIÓN Y MÉTRICAS
+# =============================================
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_LOGGED_STATEMENTS = 100
+
+class RequestStats:
+    """Tiempos y consultas acumulados durante una petición."""
+    __slots__ = ('started', 'queries', 'db_time', 'pool_wait', 'render_time',
+                 'render_started', 'statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.render_time = 0.0
+        self.render_started = []
+        self.statements = []
+
+def current_stats():
+    """Estadísticas de la petición en curso, o None fuera de una petición."""
+    if has_request_context():
+        return g.get('request_stats')
+    return None
+
+class EndpointMetrics:
+    """Agregados por endpoint en memoria del worker (ver MetricsStore)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, stats, total):
+        with self._lock:
+            data = self._endpoints.get(endpoint)
+            if data is None:
+                data = self._endpoints[endpoint] = {
+                    'requests': 0, 'queries': 0, 'db_time': 0.0, 'pool_wait': 0.0,
+                    'render_time': 0.0, 'total_time': 0.0,
+                    'buckets': [0] * len(LATENCY_BUCKETS),
+                }
+            data['requests'] += 1
+            data['queries'] += stats.queries
+            data['db_time'] += stats.db_time
+            data['pool_wait'] += stats.pool_wait
+            data['render_time'] += stats.render_time
+            data['total_time'] += total
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if total <= bound:
+                    data['buckets'][i] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(data, buckets=list(data['buckets']))
+                    for endpoint, data in self._endpoints.items()}
+
+endpoint_metrics = EndpointMetrics()
+
+class MetricsStore:
+    """
+    Comparte los contadores entre los workers de gunicorn: cada worker los
+    vuelca a METRICS_DIR/<pid>.json (como mucho una vez por intervalo) y
+    /metrics suma los archivos de todos. Los archivos de workers terminados
+    se conservan para que los contadores nunca retrocedan.
+    """
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._flushed = 0.0
+        self._failing = False
+
+    def snapshot(self):
+        caches = {'categories': category_cache.stats(), 'post_cards': post_card_cache.stats()}
+        return {
+            'endpoints': endpoint_metrics.snapshot(),
+            'caches': {name: {field: stats.get(field, 0)
+                              for field in ('hits', 'misses', 'evictions')}
+                       for name, stats in caches.items()},
+        }
+
+    def flush(self, force=False):
+        """
+        Vuelca los contadores de este worker. Devuelve False si no se pudo
+        escribir: un disco lleno o un directorio borrado nunca rompen la
+        petición, solo se registra un aviso hasta que vuelva a funcionar.
+        """
+        now = time.monotonic()
+        if not force and now - self._flushed < self.interval:
+            return True
+        if not self._lock.acquire(blocking=force):
+            return True
+        try:
+            path = os.path.join(self.directory, f'{os.getpid()}.json')
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(self.snapshot(), f)
+            # os.replace es atómico: un lector nunca ve un archivo a medias
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            if not self._failing:
+                app.logger.warning("No se pudieron guardar las métricas en %s: %s",
+                                   self.directory, e)
+            self._failing = True
+            return False
+        else:
+            self._failing = False
+            return True
+        finally:
+            self._flushed = now
+            self._lock.release()
+
+    def collect(self):
+        """Suma los contadores de todos los workers (incluido este, al día)."""
+        own = f'{os.getpid()}.json'
+        datasets = []
+        if not self.flush(force=True):
+            # El archivo de este worker puede estar desfasado: se usa la memoria
+            datasets.append(self.snapshot())
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith('.json') or (datasets and name == own):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    datasets.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        merged = {'endpoints': {}, 'caches': {}}
+        for data in datasets:
+            for endpoint, values in data['endpoints'].items():
+                total = merged['endpoints'].get(endpoint)
+                if total is None:
+                    merged['endpoints'][endpoint] = dict(values)
+                    continue
+                for key, value in values.items():
+                    if key == 'buckets':
+                        total['buckets'] = [a + b for a, b in zip(total['buckets'], value)]
+                    else:
+                        total[key] += value
+            for cache, values in data['caches'].items():
+                total = merged['caches'].setdefault(cache, {})
+                for key, value in values.items():
+                    total[key] = total.get(key, 0) + value
+        return merged
+
+metrics_store = MetricsStore(app.config['METRICS_DIR'], app.config['METRICS_FLUSH_SECONDS'])
+
+def on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    started = conn.info.get('query_started')
+    if stats is None or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats.queries += 1
+    stats.db_time += elapsed
+    if len(stats.statements) < MAX_LOGGED_STATEMENTS:
+        stats.statements.append((elapsed, statement))
+
+def instrument_engine(engine):
+    """Registra los eventos de SQL y mide la espera al obtener conexiones del pool."""
+    event.listen(engine, 'before_cursor_execute', on_before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', on_after_cursor_execute)
+
+    # SQLAlchemy no tiene evento previo al checkout: se envuelve raw_connection,
+    # que es por donde cada Connection obtiene su conexión del pool.
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        finally:
+            stats = current_stats()
+            if stats is not None:
+                stats.pool_wait += time.perf_counter() - started
+
+    engine.raw_connection = timed_raw_connection
+
+def on_request_started(sender, **extra):
+    g.request_stats = RequestStats()
+
+def on_before_render_template(sender, template, context, **extra):
+    stats = current_stats()
+    if stats is not None:
+        stats.render_started.append(time.perf_counter())
+
+def on_template_rendered(sender, template, context, **extra):
+    stats = current_stats()
+    if stats is not None and stats.render_started:
+        stats.render_time += time.perf_counter() - stats.render_started.pop()
+
+def on_request_finished(sender, response, **extra):
+    stats = current_stats()
+    if stats is None:
+        return
+    total = time.perf_counter() - stats.started
+    endpoint = request.endpoint or 'unknown'
+    endpoint_metrics.record(endpoint, stats, total)
+    metrics_store.flush()
+
+    if app.config['METRICS_SERVER_TIMING']:
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+            f'pool;dur={stats.pool_wait * 1000:.1f}',
+            f'render;dur={stats.render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+    if total * 1000 >= app.config['METRICS_SLOW_REQUEST_MS']:
+        statements = '\n'.join(f'  [{elapsed * 1000:.1f} ms] {statement}'
+                               for elapsed, statement in stats.statements)
+        app.logger.warning(
+            "Petición lenta %s %s (%s): %.1f ms, %d consultas, db %.1f ms, "
+            "pool %.1f ms, render %.1f ms\n%s",
+            request.method, request.path, endpoint, total * 1000, stats.queries,
+            stats.db_time * 1000, stats.pool_wait * 1000, stats.render_time * 1000,
+            statements)
+
+def init_metrics():
+    """Activa la instrumentación (solo si METRICS_ENABLED está activo)."""
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+    request_started.connect(on_request_started, app)
+    request_finished.connect(on_request_finished, app)
+    before_render_template.connect(on_before_render_template, app)
+    template_rendered.connect(on_template_rendered, app)
+
+def render_prometheus():
+    """Genera las métricas de todos los workers en formato de texto de Prometheus."""
+    data = metrics_store.collect()
+    lines = []
+
+    def sample(name, labels, value):
+        label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+        lines.append(f'{name}{{{label_text}}} {value}')
+
+    def header(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    endpoints = data['endpoints']
+    counters = [
+        ('blog_requests_total', 'requests', 'Peticiones atendidas.'),
+        ('blog_db_queries_total', 'queries', 'Consultas SQL ejecutadas.'),
+        ('blog_db_seconds_total', 'db_time', 'Tiempo en consultas SQL.'),
+        ('blog_pool_wait_seconds_total', 'pool_wait', 'Espera al obtener conexiones del pool.'),
+        ('blog_render_seconds_total', 'render_time', 'Tiempo renderizando plantillas.'),
+    ]
+    for name, field, help_text in counters:
+        header(name, 'counter', help_text)
+        for endpoint, values in endpoints.items():
+            sample(name, {'endpoint': endpoint}, values[field])
+
+    name = 'blog_request_duration_seconds'
+    header(name, 'histogram', 'Latencia total por petición.')
+    for endpoint, values in endpoints.items():
+        labels = {'endpoint': endpoint}
+        for bound, count in zip(LATENCY_BUCKETS, values['buckets']):
+            sample(f'{name}_bucket', dict(labels, le=bound), count)
+        sample(f'{name}_bucket', dict(labels, le='+Inf'), values['requests'])
+        sample(f'{name}_sum', labels, values['total_time'])
+        sample(f'{name}_count', labels, values['requests'])
+
+    for field in ('hits', 'misses', 'evictions'):
+        name = f'blog_cache_{field}_total'
+        header(name, 'counter', f'Cachés: {field}.')
+        for cache, values in data['caches'].items():
+            sample(name, {'cache': cache}, values[field])
+    return '\n'.join(lines) + '\n'
+
+if app.config['METRICS_ENABLED']:
+    init_metrics()
 
 # =============================================
 # RUTAS PRINCIPALES
@@ -68,15 +1139,45 @@ class Post(db.Model):
 def home():
     return render_template('home.html')
 
+def render_feed(query, **context):
+    """Renderiza una página del listado de posts, respondiendo 304 si no cambió."""
+    etag, last_modified = posts_validator()
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    posts, next_cursor, prev_cursor = paginate_posts(
+        query,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+    )
+    response = make_response(render_template(
+        'index.html', posts=posts, next_cursor=next_cursor, prev_cursor=prev_cursor,
+        **context))
+    return with_validators(response, etag, last_modified)
+
 @app.route('/index')
 def index():
     try:
-        posts = Post.query.order_by(Post.created_at.desc()).all()
-        return render_template('index.html', posts=posts)
+        return render_feed(Post.query)
     except Exception as e:
         flash(f"Error al cargar los posts: {str(e)}", "error")
         return render_template('index.html', posts=[])
 
+@app.route('/search')
+def search():
+    q = request.args.get('q', '').strip()
+    page = request.args.get('page', 1, type=int)
+    page = max(page, 1)
+    if not q:
+        return render_template('search.html', q=q, posts=[], page=page, has_next=False)
+    try:
+        posts, has_next = search_posts(q, page=page)
+        return render_template('search.html', q=q, posts=posts, page=page, has_next=has_next)
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Error al buscar: {str(e)}", "error")
+        return render_template('search.html', q=q, posts=[], page=page, has_next=False)
+
 # =============================================
 # RUTAS PARA POSTS
 # =============================================
@@ -91,7 +1192,7 @@ def add_post():
         try:
             title = request.form['title'].strip()
             content = request.form['content'].strip()
-            category_id = request.form.get('category_id')
+            category_id = request.form.get('category_id', type=int)
             
             if not title or not content:
                 flash('Título y contenido son requeridos', 'error')
@@ -99,6 +1200,7 @@ def add_post():
                 
             new_post = Post(title=title, content=content, category_id=category_id)
             db.session.add(new_post)
+            adjust_post_count(category_id, 1)
             db.session.commit()
             flash('Post creado exitosamente', 'success')
             return redirect(url_for('list_posts'))
@@ -107,7 +1209,7 @@ def add_post():
             flash(f'Error al crear el post: {str(e)}', 'error')
 
     try:
-        categories = Category.query.order_by(Category.name).all()
+        categories = category_cache.get()
         return render_template('add_post.html', categories=categories)
     except Exception as e:
         flash(f"Error al cargar categorías: {str(e)}", "error")
@@ -120,8 +1222,13 @@ def update_post(id):
         try:
             post.title = request.form['title'].strip()
             post.content = request.form['content'].strip()
-            post.category_id = request.form.get('category_id')
+            old_category_id = post.category_id
+            post.category_id = request.form.get('category_id', type=int)
+            post.updated_at = datetime.utcnow()
+            if post.category_id != old_category_id:
+                adjust_post_counts({old_category_id: -1, post.category_id: 1})
             db.session.commit()
+            post_card_cache.invalidate_post(id)
             flash('Post actualizado exitosamente', 'success')
             return redirect(url_for('list_posts'))
         except Exception as e:
@@ -129,7 +1236,7 @@ def update_post(id):
             flash(f'Error al actualizar el post: {str(e)}', 'error')
 
     try:
-        categories = Category.query.order_by(Category.name).all()
+        categories = category_cache.get()
         return render_template('update_post.html', post=post, categories=categories)
     except Exception as e:
         flash(f"Error al cargar datos: {str(e)}", "error")
@@ -140,13 +1247,52 @@ def delete_post(id):
     try:
         post = Post.query.get_or_404(id)
         db.session.delete(post)
+        adjust_post_count(post.category_id, -1)
+        bump_cache_version(POST_DELETIONS)
         db.session.commit()
+        post_card_cache.invalidate_post(id)
         flash('Post eliminado exitosamente', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'Error al eliminar el post: {str(e)}', 'error')
     return redirect(url_for('list_posts'))
 
+# =============================================
+# API DE EXPORTACIÓN E IMPORTACIÓN
+# =============================================
+
+@app.route('/api/posts/export')
+def export_posts():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in BULK_FORMATS:
+        return jsonify({'error': f"Formato no soportado: {fmt}"}), 400
+    if fmt == 'csv':
+        body, mimetype = generate_csv(iter_export_rows()), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(iter_export_rows()), 'application/x-ndjson'
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=posts.{fmt}'},
+    )
+
+@app.route('/api/posts/import', methods=['POST'])
+def import_posts_api():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in BULK_FORMATS:
+        return jsonify({'error': f"Formato no soportado: {fmt}"}), 400
+    batch_size = request.args.get('batch_size', type=int)
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    try:
+        imported = import_posts(iter_import_records(stream, fmt), batch_size)
+    except ImportPostsError as e:
+        return jsonify({
+            'error': f'Error al importar los posts: {str(e)}',
+            'imported': e.imported,
+            'failed_record': e.record,
+        }), 400
+    return jsonify({'imported': imported})
+
 # =============================================
 # RUTAS PARA CATEGORÍAS
 # =============================================
@@ -154,12 +1300,27 @@ def delete_post(id):
 @app.route('/categories')
 def list_categories():
     try:
+        etag, last_modified = categories_validator()
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        # Lectura directa: incluye post_count, que no se guarda en la caché
         categories = Category.query.order_by(Category.name).all()
-        return render_template('categories.html', categories=categories)
+        response = make_response(render_template('categories.html', categories=categories))
+        return with_validators(response, etag, last_modified)
     except Exception as e:
         flash(f"Error al cargar categorías: {str(e)}", "error")
         return render_template('categories.html', categories=[])
 
+@app.route('/categories/<int:id>/posts')
+def category_posts(id):
+    category = Category.query.get_or_404(id)
+    try:
+        return render_feed(Post.query.filter_by(category_id=id), category=category)
+    except Exception as e:
+        flash(f"Error al cargar los posts: {str(e)}", "error")
+        return render_template('index.html', posts=[], category=category)
+
 @app.route('/categories/add', methods=['GET', 'POST'])
 def add_category():
     if request.method == 'POST':
@@ -176,6 +1337,7 @@ def add_category():
                 
             new_category = Category(name=name)
             db.session.add(new_category)
+            category_cache.invalidate()
             db.session.commit()
             flash('Categoría creada exitosamente', 'success')
             return redirect(url_for('list_categories'))
@@ -203,7 +1365,9 @@ def edit_category(id):
                 return redirect(url_for('edit_category', id=id))
                 
             category.name = name
+            category_cache.invalidate()
             db.session.commit()
+            post_card_cache.invalidate_category(id)
             flash('Categoría actualizada exitosamente', 'success')
             return redirect(url_for('list_categories'))
         except Exception as e:
@@ -217,11 +1381,12 @@ def delete_category(id):
     try:
         category = Category.query.get_or_404(id)
         
-        if Post.query.filter_by(category_id=id).count() > 0:
+        if category.post_count > 0:
             flash('No se puede eliminar: hay posts asociados a esta categoría', 'error')
             return redirect(url_for('list_categories'))
             
         db.session.delete(category)
+        category_cache.invalidate()
         db.session.commit()
         flash('Categoría eliminada exitosamente', 'success')
     except Exception as e:
@@ -229,24 +1394,147 @@ def delete_category(id):
         flash(f'Error al eliminar la categoría: {str(e)}', 'error')
     return redirect(url_for('list_categories'))
 
+@app.route('/categories/cache-stats')
+def category_cache_stats():
+    return jsonify(category_cache.stats())
+
+@app.route('/posts/cache-stats')
+def post_card_cache_stats():
+    return jsonify(post_card_cache.stats())
+
+# =============================================
+# RUTAS DE MONITOREO
+# =============================================
+
+@app.route('/metrics')
+def metrics():
+    if not app.config['METRICS_ENABLED']:
+        abort(404)
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/replicas/health')
+def replicas_health():
+    return jsonify(replica_router.stats() if replica_router else {})
+
 # =============================================
 # INICIALIZACIÓN DE LA BASE DE DATOS
 # =============================================
 
+def upgrade_schema():
+    """
+    Añade a las tablas existentes las columnas e índices nuevos del modelo,
+    ya que db.create_all() solo crea las tablas que no existen.
+    """
+    inspector = inspect(db.engine)
+    connection = db.session.connection()
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    # Posts anteriores a la columna updated_at
+    (Post.query.filter(Post.updated_at.is_(None))
+     .update({Post.updated_at: Post.created_at}, synchronize_session=False))
+    # Categorías anteriores a la columna post_count
+    if Category.query.filter(Category.post_count.is_(None)).first():
+        rebuild_post_counts()
+
+def create_schema():
+    """Crea o actualiza tablas, columnas, índices y búsqueda, y las categorías por defecto."""
+    with app.app_context():
+        # Solo el primario: las réplicas son binds y no deben bloquear el arranque
+        db.create_all(bind_key=None)
+        upgrade_schema()
+        init_search_index()
+        # Crear categorías por defecto si no existen
+        if Category.query.count() == 0:
+            default_categories = ['General', 'Tecnología', 'Deportes', 'Entretenimiento']
+            for cat_name in default_categories:
+                db.session.add(Category(name=cat_name))
+        category_cache.invalidate()
+        db.session.commit()
+
 def init_db():
     try:
-        with app.app_context():
-            db.create_all()
-            # Crear categorías por defecto si no existen
-            if Category.query.count() == 0:
-                default_categories = ['General', 'Tecnología', 'Deportes', 'Entretenimiento']
-                for cat_name in default_categories:
-                    db.session.add(Category(name=cat_name))
-                db.session.commit()
-            print("✅ Base de datos inicializada correctamente")
+        create_schema()
+        print("✅ Base de datos inicializada correctamente")
     except Exception as e:
         print(f"❌ Error al inicializar la base de datos: {str(e)}")
 
+# =============================================
+# COMANDOS DE LA CLI (flask ...)
+# =============================================
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Crea o actualiza el esquema. Ejecutar en cada despliegue, antes de gunicorn."""
+    try:
+        create_schema()
+    except Exception as e:
+        raise click.ClickException(f"Error al inicializar la base de datos: {e}")
+    click.echo("✅ Base de datos inicializada correctamente")
+
+@app.cli.command('import-posts')
+@click.argument('source', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(BULK_FORMATS), default='ndjson',
+              help='Formato del archivo de entrada.')
+@click.option('--batch-size', type=int, default=None,
+              help='Número de posts por INSERT.')
+def import_posts_command(source, fmt, batch_size):
+    """Importa posts en bloque desde un archivo NDJSON o CSV (o stdin)."""
+    try:
+        imported = import_posts(iter_import_records(source, fmt), batch_size)
+    except ImportPostsError as e:
+        raise click.ClickException(
+            f"{e}\n{e.imported} posts ya importados; reanudar desde el registro {e.imported + 1}")
+    click.echo(f"✅ {imported} posts importados")
+
+SEED_WORDS = (
+    'noticia gobierno ciudad universidad estudiantes partido equipo tecnología '
+    'empresa mercado economía salud clima lluvia festival música cine proyecto '
+    'ciencia investigación desarrollo software datos red seguridad elecciones '
+    'congreso reforma transporte metro calle vecinos escuela maestro alumnos '
+    'resultado temporada campeonato jugador entrenador afición estadio premio '
+    'concierto película estreno serie plataforma usuarios aplicación servidor'
+).split()
+
+def generate_seed_posts(count, categories, seed=None):
+    """
+    Genera registros de posts de tamaño realista (títulos de 5-12 palabras,
+    contenido de 80-400 palabras) repartidos entre las categorías dadas.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        title = ' '.join(rng.choices(SEED_WORDS, k=rng.randint(5, 12))).capitalize()
+        content = ' '.join(rng.choices(SEED_WORDS, k=rng.randint(80, 400)))
+        yield {'title': title, 'content': content.capitalize() + '.',
+               'category': rng.choice(categories)}
+
+def seed_database(categories=10, posts=1000, seed=42, batch_size=None):
+    """Crea datos de prueba: N categorías y M posts. Devuelve los posts insertados."""
+    names = [f'Categoría {i}' for i in range(1, categories + 1)]
+    return import_posts(generate_seed_posts(posts, names, seed), batch_size)
+
+@app.cli.command('seed-db')
+@click.option('--categories', type=int, default=10, help='Número de categorías.')
+@click.option('--posts', type=int, default=1000, help='Número de posts a generar.')
+@click.option('--seed', type=int, default=42, help='Semilla para datos reproducibles.')
+def seed_db_command(categories, posts, seed):
+    """Genera categorías y posts de prueba (para benchmarks)."""
+    inserted = seed_database(categories, posts, seed)
+    click.echo(f"✅ {inserted} posts generados en {categories} categorías")
+
+@app.cli.command('rebuild-post-counts')
+def rebuild_post_counts_command():
+    """Recalcula el contador de posts de cada categoría."""
+    updated = rebuild_post_counts()
+    db.session.commit()
+    click.echo(f"✅ Contadores recalculados en {updated} categorías")
+
 # =============================================
 # EJECUCIÓN DE LA APLICACIÓN
 # =============================================
@@ -0,0 +1,391 @@
+"""
+Benchmark reproducible de todas las rutas de app.py.
+
+Genera datos de prueba de varios tamaños, recorre cada ruta con el cliente
+de pruebas de Flask (o contra un gunicorn local) y reporta latencia
+p50/p95/p99, peticiones por segundo y consultas SQL por petición.
+Los resultados se guardan en JSON para compararlos entre ejecuciones.
+
+Cuenta como error toda respuesta HTTP >= 400 y toda respuesta con un mensaje
+flash de error, ya que la app convierte los fallos de base de datos en un
+200/302 con flash. En modo gunicorn las consultas por petición se leen de
+/metrics (la instrumentación se activa en ese gunicorn).
+
+Uso:
+    python benchmark.py --sizes 1000,10000 --requests 200
+    python benchmark.py --database-url postgresql://localhost/blog_bench
+    python benchmark.py --gunicorn --workers 4 --concurrency 8
+    python benchmark.py --baseline benchmark_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# =============================================
+# ESCENARIOS (UNO POR RUTA)
+# =============================================
+
+def scenario_index(ctx, n):
+    return [('GET', '/index', None)] * n
+
+def scenario_index_deep(ctx, n):
+    # Página a mitad del listado: con el cursor debe costar lo mismo que la primera
+    app_module = ctx['app']
+    post = (app_module.Post.query
+            .order_by(app_module.Post.created_at.desc(), app_module.Post.id.desc())
+            .offset(ctx['size'] // 2).first())
+    cursor = app_module.encode_cursor(post) if post else ''
+    return [('GET', f'/index?after={cursor}', None)] * n
+
+def scenario_search(ctx, n):
+    words = ctx['app'].SEED_WORDS
+    return [('GET', '/search?' + urllib.parse.urlencode({'q': words[i % len(words)]}), None)
+            for i in range(n)]
+
+def scenario_add_post_form(ctx, n):
+    return [('GET', '/post/new', None)] * n
+
+def scenario_add_post(ctx, n):
+    category_id = ctx['category_ids'][0]
+    return [('POST', '/post/new', {'title': f'Benchmark {i}',
+                                   'content': 'Contenido de benchmark ' * 20,
+                                   'category_id': category_id})
+            for i in range(n)]
+
+def scenario_update_post_form(ctx, n):
+    ids = ctx['post_ids']
+    return [('GET', f'/post/update/{ids[i % len(ids)]}', None) for i in range(n)]
+
+def scenario_update_post(ctx, n):
+    # Cada petición mueve el post a otra categoría distinta de la actual, en todas
+    # las rondas, para que todos los tamaños midan el mismo camino (con contadores)
+    posts, category_ids = ctx['posts'], ctx['category_ids']
+    specs = []
+    for i in range(n):
+        post_id, current = posts[i % len(posts)]
+        position = category_ids.index(current) if current in category_ids else -1
+        target = category_ids[(position + 1 + i // len(posts)) % len(category_ids)]
+        specs.append(('POST', f'/post/update/{post_id}',
+                      {'title': f'Actualizado {i}', 'content': 'Contenido actualizado ' * 20,
+                       'category_id': target}))
+    return specs
+
+def scenario_delete_post(ctx, n):
+    # Elimina los posts más recientes (los creados por scenario_add_post)
+    app_module = ctx['app']
+    ids = [post_id for (post_id,) in app_module.db.session.query(app_module.Post.id)
+           .order_by(app_module.Post.id.desc()).limit(n)]
+    return [('GET', f'/post/delete/{post_id}', None) for post_id in ids]
+
+def scenario_list_categories(ctx, n):
+    return [('GET', '/categories', None)] * n
+
+def scenario_add_category(ctx, n):
+    return [('POST', '/categories/add', {'name': f"Bench {ctx['run_id']} {i}"})
+            for i in range(n)]
+
+def bench_category_ids(ctx):
+    app_module = ctx['app']
+    prefix = f"Bench {ctx['run_id']} "
+    return [category_id for (category_id,) in app_module.db.session.query(app_module.Category.id)
+            .filter(app_module.Category.name.startswith(prefix))
+            .order_by(app_module.Category.id)]
+
+def scenario_edit_category(ctx, n):
+    ids = bench_category_ids(ctx)
+    return [('POST', f'/categories/edit/{ids[i % len(ids)]}',
+             {'name': f"Bench {ctx['run_id']} editada {i}"})
+            for i in range(min(n, len(ids)))]
+
+def scenario_delete_category(ctx, n):
+    return [('GET', f'/categories/delete/{category_id}', None)
+            for category_id in bench_category_ids(ctx)[:n]]
+
+# El orden importa: add_* crea los datos que luego usan edit_* y delete_*
+SCENARIOS = [
+    ('index', scenario_index),
+    ('index_deep', scenario_index_deep),
+    ('search', scenario_search),
+    ('add_post_form', scenario_add_post_form),
+    ('add_post', scenario_add_post),
+    ('update_post_form', scenario_update_post_form),
+    ('update_post', scenario_update_post),
+    ('delete_post', scenario_delete_post),
+    ('list_categories', scenario_list_categories),
+    ('add_category', scenario_add_category),
+    ('edit_category', scenario_edit_category),
+    ('delete_category', scenario_delete_category),
+]
+
+# =============================================
+# EJECUCIÓN DE PETICIONES
+# =============================================
+
+class QueryCounter:
+    """Cuenta las consultas SQL ejecutadas por el motor de la aplicación."""
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (values debe estar ordenado)."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+def summarize(latencies, elapsed, errors, queries=None):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3) if count else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3) if count else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3) if count else None,
+        'mean_ms': round(sum(latencies) / count * 1000, 3) if count else None,
+        'throughput_rps': round(count / elapsed, 1) if elapsed else None,
+        'queries_per_request': round(queries / count, 2) if count and queries is not None else None,
+    }
+
+def is_app_error(ctx, status, body, set_cookies):
+    """
+    True si la respuesta es un error: estado >= 400, una página con un aviso
+    de error ya renderizado, o una redirección cuya cookie de sesión trae un
+    mensaje flash de categoría 'error'.
+    """
+    if status >= 400 or b'notification is-error' in body:
+        return True
+    for header in set_cookies:
+        name, _, rest = header.partition('=')
+        if name.strip() != ctx['session_cookie']:
+            continue
+        try:
+            data = ctx['session_serializer'].loads(rest.split(';', 1)[0])
+        except Exception:
+            continue
+        if any(category == 'error' for category, _ in data.get('_flashes', [])):
+            return True
+    return False
+
+def run_test_client(ctx, specs):
+    client = ctx['app'].app.test_client(use_cookies=False)
+    counter = ctx['query_counter']
+    latencies, errors = [], 0
+    queries_before = counter.count
+    started = time.perf_counter()
+    for method, path, data in specs:
+        t0 = time.perf_counter()
+        response = client.open(path, method=method, data=data)
+        latencies.append(time.perf_counter() - t0)
+        if is_app_error(ctx, response.status_code, response.data,
+                        response.headers.getlist('Set-Cookie')):
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, errors, counter.count - queries_before)
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+def run_http(ctx, specs):
+    opener = urllib.request.build_opener(NoRedirect)
+    base_url = ctx['base_url']
+
+    def fetch(spec):
+        method, path, data = spec
+        body = urllib.parse.urlencode(data).encode() if data else None
+        t0 = time.perf_counter()
+        try:
+            with opener.open(urllib.request.Request(base_url + path, data=body, method=method)) as response:
+                content = response.read()
+                error = is_app_error(ctx, response.status, content,
+                                     response.headers.get_all('Set-Cookie') or [])
+        except urllib.error.HTTPError as e:
+            content = e.read()
+            error = is_app_error(ctx, e.code, content, e.headers.get_all('Set-Cookie') or [])
+        except OSError:
+            error = True
+        return time.perf_counter() - t0, error
+
+    queries_before = scrape_query_count(base_url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=ctx['concurrency']) as pool:
+        results = list(pool.map(fetch, specs))
+    elapsed = time.perf_counter() - started
+    queries = scrape_query_count(base_url) - queries_before
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, error in results if error)
+    return summarize(latencies, elapsed, errors, queries)
+
+def scrape_query_count(base_url):
+    """Total de consultas SQL de todos los workers, según /metrics."""
+    with urllib.request.urlopen(base_url + '/metrics') as response:
+        text = response.read().decode()
+    return sum(float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+               if line.startswith('blog_db_queries_total{'))
+
+# =============================================
+# GUNICORN LOCAL
+# =============================================
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_gunicorn(database_url, workers):
+    port = free_port()
+    # Métricas compartidas entre workers y volcadas en cada petición,
+    # para leer las consultas por petición desde /metrics
+    env = dict(os.environ, DATABASE_URL=database_url, METRICS_ENABLED='1',
+               METRICS_DIR=tempfile.mkdtemp(prefix='blog-bench-metrics-'),
+               METRICS_FLUSH_SECONDS='0')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), 'app:app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + '/', timeout=1).read()
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('gunicorn no respondió a tiempo')
+
+# =============================================
+# PROGRAMA PRINCIPAL
+# =============================================
+
+def compare_with_baseline(results, baseline_path, threshold):
+    """Imprime la variación de p95 respecto a un baseline; devuelve True si hay regresiones."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressed = False
+    print(f"\nComparación con {baseline_path} (p95, umbral {threshold:.0%}):")
+    for size, routes in results.items():
+        for route, stats in routes.items():
+            old = baseline.get(size, {}).get(route, {}).get('p95_ms')
+            new = stats['p95_ms']
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = ''
+            if change > threshold:
+                flag, regressed = '  <-- REGRESIÓN', True
+            print(f"  {size:>8} {route:<18} {old:9.2f} -> {new:9.2f} ms ({change:+.0%}){flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de las rutas de app.py')
+    parser.add_argument('--database-url',
+                        help='Base de datos a usar (por defecto un SQLite temporal).')
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Número de posts de cada ronda, separados por comas.')
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=100,
+                        help='Peticiones por ruta y tamaño.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--gunicorn', action='store_true',
+                        help='Medir contra un gunicorn local en lugar del cliente de pruebas.')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Workers de gunicorn (el Dockerfile usa 4).')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Peticiones simultáneas en modo gunicorn.')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='JSON de una ejecución anterior para comparar.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Aumento relativo de p95 considerado regresión.')
+    args = parser.parse_args()
+
+    # DATABASE_URL debe fijarse antes de importar app (y antes de load_dotenv)
+    database_url = args.database_url or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(prefix='blog-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = database_url
+    # Un PostgreSQL local normalmente no tiene SSL: usarlo solo si está disponible
+    os.environ.setdefault('DATABASE_SSLMODE', 'prefer')
+    import app as app_module
+
+    app_module.init_db()
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    results = {}
+    process = None
+    try:
+        with app_module.app.app_context():
+            ctx = {
+                'app': app_module,
+                'query_counter': QueryCounter(app_module.db.engine),
+                'concurrency': args.concurrency,
+                'run_id': datetime.utcnow().strftime('%Y%m%d%H%M%S'),
+                'session_cookie': app_module.app.config['SESSION_COOKIE_NAME'],
+                'session_serializer': app_module.app.session_interface
+                                      .get_signing_serializer(app_module.app),
+            }
+            if args.gunicorn:
+                process, ctx['base_url'] = start_gunicorn(database_url, args.workers)
+            for size in sizes:
+                existing = app_module.Post.query.count()
+                if existing < size:
+                    print(f"Generando {size - existing} posts...")
+                    app_module.seed_database(args.categories, size - existing,
+                                             seed=args.seed + existing)
+                ctx['size'] = size
+                ctx['category_ids'] = [c.id for c in app_module.Category.query.order_by(app_module.Category.id)]
+                ctx['posts'] = (app_module.db.session
+                                .query(app_module.Post.id, app_module.Post.category_id)
+                                .order_by(app_module.Post.id).limit(args.requests).all())
+                ctx['post_ids'] = [post_id for post_id, _ in ctx['posts']]
+                results[str(size)] = {}
+                for name, scenario in SCENARIOS:
+                    specs = scenario(ctx, args.requests)
+                    app_module.db.session.remove()
+                    run = run_http if args.gunicorn else run_test_client
+                    stats = run(ctx, specs)
+                    results[str(size)][name] = stats
+                    print(f"{size:>8} {name:<18} p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  "
+                          f"p99 {stats['p99_ms']} ms  {stats['throughput_rps']} req/s  "
+                          f"{stats['queries_per_request']} consultas/petición  "
+                          f"{stats['errors']} errores")
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'database': urllib.parse.urlparse(database_url).scheme,
+            'mode': 'gunicorn' if args.gunicorn else 'test_client',
+            'workers': args.workers if args.gunicorn else 1,
+            'concurrency': args.concurrency if args.gunicorn else 1,
+            'requests_per_route': args.requests,
+            'python': platform.python_version(),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Resultados guardados en {args.output}")
+
+    if args.baseline and compare_with_baseline(results, args.baseline, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
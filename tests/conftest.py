@@ -0,0 +1,32 @@
+import importlib
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def load_app(monkeypatch):
+    """Importa app.py de nuevo con las variables de entorno dadas."""
+    def load(**env):
+        for key in ('DATABASE_REPLICA_URLS', 'METRICS_ENABLED'):
+            monkeypatch.delenv(key, raising=False)
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        sys.modules.pop('app', None)
+        return importlib.import_module('app')
+    yield load
+    sys.modules.pop('app', None)
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path, load_app):
+    """Dos archivos SQLite: el primario inicializado y una copia como réplica."""
+    primary = tmp_path / 'primary.db'
+    replica = tmp_path / 'replica.db'
+    load_app(DATABASE_URL=f'sqlite:///{primary}').init_db()
+    shutil.copy(primary, replica)
+    return primary, replica
@@ -0,0 +1,75 @@
+import pytest
+
+
+@pytest.fixture
+def blog(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "blog.db"}')
+    app.init_db()
+    client = app.app.test_client()
+    for i in range(1, 4):
+        client.post('/post/new', data={'title': f'Post {i}', 'content': 'c', 'category_id': '1'})
+    return app
+
+
+def etag(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def revalidate(client, url, tag):
+    return client.get(url, headers={'If-None-Match': tag}).status_code
+
+
+@pytest.mark.parametrize('url', ['/posts', '/index', '/categories', '/categories/1/posts'])
+def test_unchanged_listing_returns_304(blog, url):
+    client = blog.app.test_client()
+    tag = etag(client, url)
+
+    assert revalidate(client, url, tag) == 304
+    response = client.get(url, headers={'If-None-Match': tag})
+    assert response.data == b''
+
+
+def edit_post(client):
+    client.post('/post/update/2', data={'title': 'Editado', 'content': 'c', 'category_id': '1'})
+
+
+def move_post(client):
+    client.post('/post/update/2', data={'title': 'Post 2', 'content': 'c', 'category_id': '2'})
+
+
+def delete_post(client):
+    client.get('/post/delete/1')
+
+
+def rename_category(client):
+    client.post('/categories/edit/1', data={'name': 'Renombrada'})
+
+
+def import_posts(client):
+    client.post('/api/posts/import', data=b'{"title": "Nuevo", "content": "c", "category": "General"}\n')
+
+
+@pytest.mark.parametrize('change', [edit_post, move_post, delete_post, rename_category, import_posts])
+@pytest.mark.parametrize('url', ['/posts', '/categories'])
+def test_changes_invalidate_etag(blog, change, url):
+    client = blog.app.test_client()
+    tag = etag(client, url)
+
+    change(blog.app.test_client())
+
+    assert revalidate(client, url, tag) == 200
+    assert etag(client, url) != tag
+
+
+def test_pending_flash_skips_304(blog):
+    client = blog.app.test_client()
+    tag = etag(client, '/posts')
+    with client.session_transaction() as session:
+        session['_flashes'] = [('success', 'Post creado exitosamente')]
+
+    response = client.get('/posts', headers={'If-None-Match': tag})
+    assert response.status_code == 200
+    assert 'Post creado exitosamente' in response.data.decode()
+    assert revalidate(client, '/posts', tag) == 304
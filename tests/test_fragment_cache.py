@@ -0,0 +1,76 @@
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def blog(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "blog.db"}')
+    app.init_db()
+    with app.app.app_context():
+        for i, category_id in enumerate([1, 1, 2, 2], start=1):
+            app.db.session.add(app.Post(title=f'Post {i}', content='Ñandú: 5 € ' * 50,
+                                        category_id=category_id))
+        app.db.session.commit()
+    return app
+
+
+def render_all(app, cache, ids):
+    with app.app.test_request_context('/posts'):
+        for post_id in ids:
+            cache.render(app.db.session.get(app.Post, post_id))
+
+
+def test_size_counts_memory_not_characters(blog):
+    cache = blog.FragmentCache(max_bytes=10 ** 6)
+    render_all(blog, cache, [1])
+
+    (_, fragment, size), = cache._entries.values()
+    # Con caracteres fuera de Latin-1 CPython guarda 2 bytes por carácter
+    assert size == sys.getsizeof(fragment) + cache.ENTRY_OVERHEAD
+    assert size > 2 * len(fragment)
+    assert cache.stats()['bytes'] == size
+
+
+def test_lru_evicts_oldest_within_max_bytes(blog):
+    probe = blog.FragmentCache(max_bytes=10 ** 6)
+    render_all(blog, probe, [1])
+    entry_size = probe.stats()['bytes']
+    cache = blog.FragmentCache(max_bytes=entry_size * 2 + entry_size // 2)
+
+    render_all(blog, cache, [1, 2, 1, 3])
+
+    assert [key[0] for key in cache._entries] == [1, 3]
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+    assert (stats['hits'], stats['misses']) == (1, 3)
+
+
+def test_fragment_larger_than_cache_is_not_stored(blog):
+    cache = blog.FragmentCache(max_bytes=100)
+    render_all(blog, cache, [1])
+
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
+
+
+def test_invalidate_by_category_and_post(blog):
+    cache = blog.FragmentCache(max_bytes=10 ** 6)
+    render_all(blog, cache, [1, 2, 3, 4])
+
+    cache.invalidate_category(1)
+    assert sorted(key[0] for key in cache._entries) == [3, 4]
+    cache.invalidate_post(3)
+    assert [key[0] for key in cache._entries] == [4]
+    assert cache.stats()['bytes'] == sum(entry[2] for entry in cache._entries.values())
+
+
+def test_card_reflects_category_rename(blog):
+    client = blog.app.test_client()
+    client.get('/posts')
+    client.post('/categories/edit/1', data={'name': 'Renombrada'})
+
+    page = client.get('/posts').data.decode()
+    assert 'Renombrada' in page
+    assert '>General<' not in page
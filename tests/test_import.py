@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def blog(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "blog.db"}')
+    app.init_db()
+    return app
+
+
+def ndjson(*records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+def post(i, **fields):
+    return dict({'title': f'Post {i}', 'content': 'Texto', 'category': 'General'}, **fields)
+
+
+def import_api(app, body, batch_size):
+    return app.app.test_client().post(f'/api/posts/import?batch_size={batch_size}',
+                                      data=body.encode())
+
+
+def stored_titles(app):
+    with app.app.app_context():
+        return [title for (title,) in app.db.session.query(app.Post.title).order_by(app.Post.id)]
+
+
+def test_import_commits_every_batch(blog):
+    response = import_api(blog, ndjson(*(post(i) for i in range(1, 8))), batch_size=3)
+
+    assert response.json == {'imported': 7}
+    assert len(stored_titles(blog)) == 7
+
+
+@pytest.mark.parametrize('bad', [
+    {'title': ''},
+    {'title': 5},
+    {'content': ['lista']},
+    {'category': 5},
+    {'created_at': 20240101},
+    {'created_at': 'ayer'},
+])
+def test_invalid_record_reports_committed_batches(blog, bad):
+    records = [post(i) for i in range(1, 8)]
+    records[5] = post(6, **bad)
+
+    response = import_api(blog, ndjson(*records), batch_size=2)
+
+    assert response.status_code == 400
+    assert response.json['imported'] == 4
+    assert response.json['failed_record'] == 6
+    assert 'Registro 6' in response.json['error']
+    assert stored_titles(blog) == ['Post 1', 'Post 2', 'Post 3', 'Post 4']
+
+
+def test_invalid_json_line_reports_its_record(blog):
+    body = ndjson(post(1), post(2), post(3)) + '{roto\n'
+
+    response = import_api(blog, body, batch_size=2)
+
+    assert response.json['imported'] == 2
+    assert response.json['failed_record'] == 4
+    assert 'Línea 4' in response.json['error']
+
+
+def test_database_error_reports_start_of_failed_batch(blog):
+    records = [post(i) for i in range(1, 6)]
+    records[3] = post(4, title='x' * 10000)
+    with blog.app.app_context():
+        # SQLite no limita el tamaño de VARCHAR: fuerza el fallo del INSERT
+        blog.db.session.execute(blog.db.text(
+            "CREATE TRIGGER long_title BEFORE INSERT ON posts WHEN length(NEW.title) > 200 "
+            "BEGIN SELECT RAISE(ABORT, 'título demasiado largo'); END"))
+        blog.db.session.commit()
+
+    response = import_api(blog, ndjson(*records), batch_size=2)
+
+    assert response.json['imported'] == 2
+    assert response.json['failed_record'] == 3
+    assert stored_titles(blog) == ['Post 1', 'Post 2']
+
+
+def test_cli_tells_where_to_resume(blog, tmp_path):
+    source = tmp_path / 'posts.ndjson'
+    source.write_text(ndjson(post(1), post(2), post(3, title=5)), encoding='utf-8')
+
+    result = blog.app.test_cli_runner().invoke(
+        args=['import-posts', str(source), '--batch-size', '2'])
+
+    assert result.exit_code == 1
+    assert 'Registro 3' in result.output
+    assert 'reanudar desde el registro 3' in result.output
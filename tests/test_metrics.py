@@ -0,0 +1,45 @@
+import re
+import shutil
+
+import pytest
+
+
+@pytest.fixture
+def metrics_app(tmp_path, load_app):
+    def load(metrics_dir):
+        app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "blog.db"}', METRICS_ENABLED='1',
+                       METRICS_DIR=str(metrics_dir), METRICS_FLUSH_SECONDS='0')
+        app.init_db()
+        return app
+    return load
+
+
+def requests_total(response, endpoint):
+    match = re.search(rf'blog_requests_total{{endpoint="{endpoint}"}} (\d+)', response.data.decode())
+    return int(match.group(1))
+
+
+def test_metrics_dir_removed_while_running(tmp_path, metrics_app):
+    metrics_dir = tmp_path / 'metrics'
+    app = metrics_app(metrics_dir)
+    client = app.app.test_client()
+    assert client.get('/posts').status_code == 200
+
+    shutil.rmtree(metrics_dir)
+    assert client.get('/posts').status_code == 200
+    assert requests_total(client.get('/metrics'), 'list_posts') == 2
+
+
+def test_unwritable_metrics_dir_does_not_break_requests(tmp_path, metrics_app, caplog):
+    not_a_dir = tmp_path / 'metrics'
+    not_a_dir.write_text('')
+    app = metrics_app(not_a_dir)
+    client = app.app.test_client()
+
+    for _ in range(3):
+        assert client.get('/posts').status_code == 200
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert requests_total(response, 'list_posts') == 3
+    warnings = [r for r in caplog.records if 'No se pudieron guardar las métricas' in r.getMessage()]
+    assert len(warnings) == 1
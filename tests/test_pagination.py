@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def blog(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "blog.db"}', POSTS_PER_PAGE='3')
+    app.init_db()
+    with app.app.app_context():
+        # Posts 4 a 6 comparten created_at: el id desempata
+        dates = [1, 2, 3, 4, 4, 4, 5]
+        for i, day in enumerate(dates, start=1):
+            app.db.session.add(app.Post(title=f'Post {i}', content='c', category_id=1,
+                                        created_at=datetime(2024, 1, day)))
+        app.db.session.commit()
+    return app
+
+
+def page(app, **cursors):
+    with app.app.app_context():
+        posts, next_cursor, prev_cursor = app.paginate_posts(app.Post.query, **cursors)
+        return [post.id for post in posts], next_cursor, prev_cursor
+
+
+def test_walk_forward_and_back(blog):
+    first, next_cursor, prev_cursor = page(blog)
+    assert first == [7, 6, 5]
+    assert prev_cursor is None
+
+    second, next_cursor, prev_cursor = page(blog, after=next_cursor)
+    assert second == [4, 3, 2]
+    assert prev_cursor is not None
+
+    last, last_next, last_prev = page(blog, after=next_cursor)
+    assert last == [1]
+    assert last_next is None
+
+    back, next_cursor, prev_cursor = page(blog, before=last_prev)
+    assert back == [4, 3, 2]
+    back, next_cursor, prev_cursor = page(blog, before=prev_cursor)
+    assert back == [7, 6, 5]
+    assert prev_cursor is None
+    assert next_cursor is not None
+
+
+def test_exact_multiple_has_no_empty_last_page(blog):
+    with blog.app.app_context():
+        blog.db.session.delete(blog.db.session.get(blog.Post, 1))
+        blog.db.session.commit()
+
+    _, next_cursor, _ = page(blog)
+    posts, next_cursor, _ = page(blog, after=next_cursor)
+    assert posts == [4, 3, 2]
+    assert next_cursor is None
+
+
+def test_cursor_round_trip(blog):
+    with blog.app.app_context():
+        post = blog.db.session.get(blog.Post, 5)
+        assert blog.decode_cursor(blog.encode_cursor(post)) == (post.created_at, 5)
+
+
+@pytest.mark.parametrize('cursor', ['', 'no-es-un-cursor', '!!!', 'w6k', 'YWJjfHh5eg'])
+def test_invalid_cursor_falls_back_to_first_page(blog, cursor):
+    assert page(blog, after=cursor)[0] == [7, 6, 5]
+    assert page(blog, before=cursor)[0] == [7, 6, 5]
+
+
+def test_feed_links_follow_cursors(blog):
+    client = blog.app.test_client()
+
+    html = client.get('/posts').data.decode()
+    assert 'Post 7' in html and 'Post 4' not in html
+    assert 'before=' not in html
+    next_link = html.split('class="pagination-next"')[0].rsplit('href="', 1)[1].split('"')[0]
+
+    html = client.get(next_link.replace('&amp;', '&')).data.decode()
+    assert 'Post 4' in html and 'Post 7' not in html
+    assert client.get('/posts?after=basura').status_code == 200
@@ -0,0 +1,112 @@
+import io
+
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def blog(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "blog.db"}')
+    app.init_db()
+    return app
+
+
+def category_updates(app):
+    """Registra los ids de categoría en el orden en que se actualizan sus contadores."""
+    updated = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        if statement.startswith('UPDATE categories SET post_count'):
+            updated.append(parameters[-1])
+    with app.app.app_context():
+        event.listen(app.db.engine, 'before_cursor_execute', record)
+    return updated
+
+
+def test_update_post_adjusts_counts_in_id_order(blog):
+    client = blog.app.test_client()
+    client.post('/post/new', data={'title': 'A', 'content': 'c', 'category_id': '3'})
+    updated = category_updates(blog)
+
+    client.post('/post/update/1', data={'title': 'A', 'content': 'c', 'category_id': '1'})
+    assert updated == [1, 3]
+
+
+def test_import_adjusts_counts_in_id_order(blog):
+    updated = category_updates(blog)
+    source = io.StringIO(
+        '{"title": "a", "content": "c", "category": "Deportes"}\n'
+        '{"title": "b", "content": "c", "category": "General"}\n'
+        '{"title": "c", "content": "c", "category": "Tecnología"}\n')
+
+    with blog.app.app_context():
+        blog.import_posts(blog.iter_import_records(source, 'ndjson'))
+    assert updated == [1, 2, 3]
+
+
+def counts(app):
+    with app.app.app_context():
+        return {name: count for name, count in
+                app.db.session.query(app.Category.name, app.Category.post_count)}
+
+
+def true_counts(app):
+    with app.app.app_context():
+        return {category.name: len(category.posts) for category in app.Category.query}
+
+
+def test_counts_follow_add_move_and_delete(blog):
+    client = blog.app.test_client()
+    for category_id in ('1', '1', '2'):
+        client.post('/post/new', data={'title': 't', 'content': 'c', 'category_id': category_id})
+    assert counts(blog)['General'] == 2
+    assert counts(blog)['Tecnología'] == 1
+
+    client.post('/post/update/1', data={'title': 't', 'content': 'c', 'category_id': '2'})
+    assert counts(blog)['General'] == 1
+    assert counts(blog)['Tecnología'] == 2
+
+    client.post('/post/update/1', data={'title': 't', 'content': 'c', 'category_id': ''})
+    assert counts(blog)['Tecnología'] == 1
+
+    client.get('/post/delete/2')
+    client.get('/post/delete/1')
+    assert counts(blog) == true_counts(blog)
+    assert counts(blog)['General'] == 0
+
+
+def test_import_counts_new_and_existing_categories(blog):
+    source = io.StringIO(
+        '{"title": "a", "content": "c", "category": "General"}\n'
+        '{"title": "b", "content": "c", "category": "Ciencia"}\n'
+        '{"title": "c", "content": "c", "category": "Ciencia"}\n'
+        '{"title": "d", "content": "c"}\n')
+
+    with blog.app.app_context():
+        blog.import_posts(blog.iter_import_records(source, 'ndjson'), batch_size=2)
+    assert counts(blog)['General'] == 1
+    assert counts(blog)['Ciencia'] == 2
+    assert counts(blog) == true_counts(blog)
+
+
+def test_categories_page_shows_counts(blog):
+    client = blog.app.test_client()
+    client.post('/post/new', data={'title': 't', 'content': 'c', 'category_id': '3'})
+
+    html = client.get('/categories').data.decode()
+    deportes = html.split('Deportes', 1)[1]
+    assert '>1<' in deportes.split('</tr>', 1)[0]
+
+
+def test_rebuild_post_counts_command(blog):
+    client = blog.app.test_client()
+    client.post('/post/new', data={'title': 't', 'content': 'c', 'category_id': '1'})
+    with blog.app.app_context():
+        blog.db.session.execute(blog.db.text('UPDATE categories SET post_count = 99'))
+        blog.db.session.commit()
+
+    result = blog.app.test_cli_runner().invoke(args=['rebuild-post-counts'])
+
+    assert result.exit_code == 0, result.output
+    assert counts(blog) == true_counts(blog)
+    assert counts(blog)['General'] == 1
@@ -0,0 +1,137 @@
+import re
+import sqlite3
+import time
+
+from sqlalchemy import event
+
+UNREACHABLE = 'sqlite:////nonexistent/dir/replica.db'
+
+
+def titles(response):
+    return re.findall(r'title is-4">([^<]+)', response.data.decode())
+
+
+def categories_version(path):
+    with sqlite3.connect(path) as connection:
+        row = connection.execute(
+            "SELECT version FROM cache_versions WHERE name = 'categories'").fetchone()
+    return row[0]
+
+
+def load_with_replica(load_app, primary, replica_url, **env):
+    app = load_app(DATABASE_URL=f'sqlite:///{primary}', DATABASE_REPLICA_URLS=replica_url, **env)
+    app.replica_router.check_all()
+    return app
+
+
+def test_reads_go_to_replica_and_writes_to_primary(primary_and_replica, load_app):
+    primary, replica = primary_and_replica
+    app = load_with_replica(load_app, primary, f'sqlite:///{replica}')
+    writer = app.app.test_client()
+    writer.post('/post/new', data={'title': 'Nuevo', 'content': 'c', 'category_id': '1'})
+
+    # La réplica (copia anterior) no tiene el post: un cliente nuevo lee de ella
+    assert titles(app.app.test_client().get('/posts')) == []
+    with sqlite3.connect(primary) as connection:
+        assert connection.execute('SELECT title FROM posts').fetchall() == [('Nuevo',)]
+
+
+def test_sticky_window_reads_from_primary_after_write(primary_and_replica, load_app):
+    primary, replica = primary_and_replica
+    app = load_with_replica(load_app, primary, f'sqlite:///{replica}',
+                            DATABASE_STICKY_SECONDS='0.5')
+    client = app.app.test_client()
+    client.post('/post/new', data={'title': 'Nuevo', 'content': 'c', 'category_id': '1'})
+
+    assert titles(client.get('/posts')) == ['Nuevo']
+    time.sleep(0.6)
+    assert titles(client.get('/posts')) == []
+
+
+def test_get_routes_that_write_use_primary(primary_and_replica, load_app):
+    primary, replica = primary_and_replica
+    app = load_with_replica(load_app, primary, f'sqlite:///{replica}')
+    app.app.test_client().post('/categories/add', data={'name': 'Temporal'})
+    with sqlite3.connect(primary) as connection:
+        category_id, = connection.execute(
+            "SELECT id FROM categories WHERE name = 'Temporal'").fetchone()
+
+    app.app.test_client().get(f'/categories/delete/{category_id}')
+    with sqlite3.connect(primary) as connection:
+        assert connection.execute(
+            "SELECT count(*) FROM categories WHERE name = 'Temporal'").fetchone() == (0,)
+
+
+def test_dml_in_read_request_goes_to_primary(primary_and_replica, load_app):
+    primary, replica = primary_and_replica
+    app = load_with_replica(load_app, primary, f'sqlite:///{replica}')
+    before = categories_version(primary)
+
+    with app.app.test_request_context('/categories'):
+        app.app.preprocess_request()
+        assert app.g.read_replica is not None
+        app.category_cache.get()
+        app.bump_cache_version('categories')
+        app.db.session.commit()
+        assert app.g.read_replica is None
+
+    assert categories_version(primary) == before + 1
+    assert categories_version(replica) == before
+
+
+def test_failover_to_primary_when_replica_is_down(primary_and_replica, load_app):
+    primary, _ = primary_and_replica
+    app = load_with_replica(load_app, primary, UNREACHABLE)
+    app.app.test_client().post('/post/new',
+                               data={'title': 'Nuevo', 'content': 'c', 'category_id': '1'})
+
+    client = app.app.test_client()
+    assert titles(client.get('/posts')) == ['Nuevo']
+    assert client.get('/replicas/health').json == {'replica_0': {'healthy': False}}
+
+
+def test_slow_health_check_does_not_block_requests(primary_and_replica, load_app):
+    primary, replica = primary_and_replica
+    app = load_app(DATABASE_URL=f'sqlite:///{primary}',
+                   DATABASE_REPLICA_URLS=f'sqlite:///{replica}')
+    with app.app.app_context():
+        # Simula una réplica que tarda en aceptar conexiones
+        event.listen(app.db.engines['replica_0'], 'connect', lambda *args: time.sleep(1))
+    app.app.test_client().post('/post/new',
+                               data={'title': 'Nuevo', 'content': 'c', 'category_id': '1'})
+
+    client = app.app.test_client()
+    started = time.monotonic()
+    assert titles(client.get('/posts')) == ['Nuevo']
+    assert time.monotonic() - started < 0.5
+
+    deadline = time.monotonic() + 5
+    while not app.replica_router.stats()['replica_0']['healthy']:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert titles(client.get('/posts')) == []
+
+
+def test_init_db_ignores_unreachable_replica(tmp_path, load_app):
+    primary = tmp_path / 'primary.db'
+    app = load_app(DATABASE_URL=f'sqlite:///{primary}', DATABASE_REPLICA_URLS=UNREACHABLE)
+    app.init_db()
+
+    with sqlite3.connect(primary) as connection:
+        assert connection.execute('SELECT count(*) FROM categories').fetchone() == (4,)
+        assert connection.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'posts_fts'").fetchone()
+
+
+def test_postgres_replicas_get_their_own_connect_timeout(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "primary.db"}',
+                   DATABASE_REPLICA_URLS=('postgresql+psycopg2://r1/blog,'
+                                          'postgresql+psycopg2://r2/blog?sslmode=disable'),
+                   DATABASE_REPLICA_CONNECT_TIMEOUT='2')
+
+    assert app.app.config['SQLALCHEMY_BINDS'] == {
+        'replica_0': {'url': 'postgresql+psycopg2://r1/blog',
+                      'connect_args': {'connect_timeout': 2, 'sslmode': 'require'}},
+        'replica_1': {'url': 'postgresql+psycopg2://r2/blog?sslmode=disable',
+                      'connect_args': {'connect_timeout': 2}},
+    }
@@ -0,0 +1,52 @@
+import sqlite3
+
+from sqlalchemy import event
+
+OLD_SCHEMA = """
+CREATE TABLE categories (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL UNIQUE);
+CREATE TABLE posts (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, content TEXT NOT NULL,
+                    category_id INTEGER REFERENCES categories (id), created_at DATETIME);
+INSERT INTO categories (id, name) VALUES (1, 'General');
+INSERT INTO posts (title, content, category_id, created_at)
+VALUES ('Antiguo', 'Texto', 1, '2024-01-01 10:00:00');
+"""
+
+
+def test_init_db_command_upgrades_existing_database(tmp_path, load_app):
+    path = tmp_path / 'blog.db'
+    with sqlite3.connect(path) as connection:
+        connection.executescript(OLD_SCHEMA)
+    app = load_app(DATABASE_URL=f'sqlite:///{path}')
+
+    result = app.app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+
+    response = app.app.test_client().get('/posts')
+    assert response.status_code == 200
+    assert 'Antiguo' in response.data.decode()
+    with sqlite3.connect(path) as connection:
+        assert connection.execute('SELECT post_count FROM categories').fetchall() == [(1,)]
+
+
+def test_init_db_command_reports_errors(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "missing" / "blog.db"}')
+
+    result = app.app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 1
+    assert 'Error al inicializar la base de datos' in result.output
+
+
+def test_posts_state_uses_index_searches(tmp_path, load_app):
+    app = load_app(DATABASE_URL=f'sqlite:///{tmp_path / "blog.db"}')
+    app.init_db()
+    statements = []
+    with app.app.app_context():
+        engine = app.db.engine
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        app.posts_state()
+        state_query = next(s for s in statements if 'max(posts.updated_at)' in s)
+        with engine.connect() as connection:
+            plan = [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + state_query)]
+
+    assert not [step for step in plan if step.startswith('SCAN posts')], plan